@@ -13,11 +13,13 @@ pyinstaller --noconfirm --onefile --windowed ^
   --icon=icon.ico ^
   --add-data "README.md;." ^
   --add-data "icon.ico;." ^
+  --add-data "styles.qss;." ^
   --hidden-import=PySide6.QtSvg ^
   --hidden-import=PySide6.QtXml ^
   --hidden-import=PySide6.QtWidgets ^
   --hidden-import=PySide6.QtCore ^
   --hidden-import=PySide6.QtGui ^
+  --hidden-import=PySide6.QtNetwork ^
   proxy_app.py
 
 echo Empaquetado completado.
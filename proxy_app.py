@@ -1,127 +1,248 @@
+import os
 import sys
+import json
+import time
+import ctypes
+import logging
 import winreg
-import subprocess
-import requests
 from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QMessageBox, QDialog,
-    QFormLayout, QGroupBox, QFrame, QGraphicsDropShadowEffect, QCheckBox
+    QFormLayout, QGroupBox, QFrame, QGraphicsDropShadowEffect, QCheckBox, QStatusBar
 )
-from PySide6.QtCore import Qt, QSettings, QThread, Signal
-from PySide6.QtGui import QIcon, QColor, QIntValidator, QFont, QPalette
+from PySide6.QtCore import Qt, QSettings, QTimer, QUrl, QRegularExpression, QObject, QRunnable, QThread, QThreadPool, Signal
+from PySide6.QtGui import QIcon, QColor, QDesktopServices, QIntValidator, QRegularExpressionValidator, QFont, QPalette
 #PRUEBA RELEASE
+# Registro de errores; sin handler configurado no se escribe nada (pythonw.exe no tiene consola)
+log = logging.getLogger("proxy_app")
+log.addHandler(logging.NullHandler())
 # Versión actual de la aplicación
 APP_VERSION = "1.0.1"
 # Debe ser en formato "owner/repo" para usar con la API de GitHub
 GITHUB_REPO = "XENITz/proxy"
+# Segundos durante los que se reutiliza la última versión consultada sin volver a GitHub al iniciar
+UPDATE_CHECK_TTL = 6 * 60 * 60
+# Reintentos ante fallos transitorios de la API de releases y espera antes de reintentar
+UPDATE_CHECK_RETRIES = 1
+UPDATE_CHECK_BACKOFF_MS = 300
+_RETRY_HTTP_STATUS = (502, 503, 504)
+# Expresión para validar el servidor proxy (compilada una sola vez): IPv4, nombre de host
+# (RFC 1123, p. ej. localhost o proxy.corp.local) o literal IPv6, con o sin corchetes
+_IPV4_OCTET = r"(25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+_HOST_LABEL = r"[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+_IPV6 = r"[0-9A-Fa-f:.]*:[0-9A-Fa-f:.]*"
+PROXY_HOST_REGEX = QRegularExpression(
+    rf"^({_IPV4_OCTET}(\.{_IPV4_OCTET}){{3}}|{_HOST_LABEL}(\.{_HOST_LABEL})*|{_IPV6}|\[{_IPV6}\])$"
+)
 
-# Clase para verificar actualizaciones en segundo plano
-def compare_versions(version1: str, version2: str) -> int:
-    """Compara dos versiones semánticas x.y.z devolviendo 1, 0, -1."""
+# Clave del registro (bajo HKEY_CURRENT_USER) con la configuración de proxy del sistema
+_INET_SUBKEY = r"Software\Microsoft\Windows\CurrentVersion\Internet Settings"
+
+# Opciones de InternetSetOptionW para avisar a WinINET de que la configuración de proxy cambió
+INTERNET_OPTION_REFRESH = 37
+INTERNET_OPTION_SETTINGS_CHANGED = 39
+# wininet.dll se carga y se enlaza una sola vez al importar el módulo
+_wininet = ctypes.WinDLL("wininet", use_last_error=True)
+_InternetSetOptionW = _wininet.InternetSetOptionW
+_InternetSetOptionW.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_ulong]
+_InternetSetOptionW.restype = ctypes.c_int
+
+# API de Win32 para esperar cambios en la clave de Internet Settings (ver _RegistryWatcher)
+REG_NOTIFY_CHANGE_LAST_SET = 0x00000004
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0
+_advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+_advapi32.RegNotifyChangeKeyValue.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_int]
+_advapi32.RegNotifyChangeKeyValue.restype = ctypes.c_long
+_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+_kernel32.CreateEventW.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_wchar_p]
+_kernel32.CreateEventW.restype = ctypes.c_void_p
+_kernel32.SetEvent.argtypes = [ctypes.c_void_p]
+_kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+_kernel32.WaitForMultipleObjects.argtypes = [ctypes.c_ulong, ctypes.POINTER(ctypes.c_void_p), ctypes.c_int, ctypes.c_ulong]
+_kernel32.WaitForMultipleObjects.restype = ctypes.c_ulong
+
+# Endpoint de la API de GitHub con la última release publicada
+RELEASES_API_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+
+# Hoja de estilo de la aplicación; se aplica una sola vez a QApplication al iniciar
+STYLESHEET_PATH = Path(__file__).parent / "styles.qss"
+# Icono de la aplicación y de la ventana (opcional)
+ICON_PATH = Path(__file__).parent / "icon.ico"
+
+# Paleta de colores de la aplicación: (rol, (r, g, b))
+_PALETTE_SPEC = (
+    (QPalette.Window, (250, 250, 250)),
+    (QPalette.WindowText, (50, 50, 50)),
+    (QPalette.Base, (255, 255, 255)),
+    (QPalette.AlternateBase, (245, 245, 245)),
+    (QPalette.ToolTipBase, (255, 255, 255)),
+    (QPalette.ToolTipText, (50, 50, 50)),
+    (QPalette.Text, (50, 50, 50)),
+    (QPalette.Button, (240, 240, 240)),
+    (QPalette.ButtonText, (50, 50, 50)),
+    (QPalette.Highlight, (33, 150, 243)),  # Material Blue
+    (QPalette.HighlightedText, (255, 255, 255)),
+)
+
+
+def load_stylesheet() -> str:
+    """Lee styles.qss; sin él la aplicación funciona igual, solo que sin estilos propios."""
     try:
-        v1_parts = [int(x) for x in version1.split('.')]
-        v2_parts = [int(x) for x in version2.split('.')]
+        return STYLESHEET_PATH.read_text(encoding="utf-8")
+    except OSError as e:
+        log.warning("No se pudo cargar la hoja de estilo: %s", e)
+        return ""
+
+
+# Utilidades para comparar versiones "x.y.z"
+def _version_tuple(version: str):
+    """Convierte 'x.y.z' en una tupla de 3 enteros, o None si no es numérica."""
+    try:
+        parts = tuple(int(x) for x in version.split('.'))[:3]
     except ValueError:
+        return None
+    return parts + (0,) * (3 - len(parts))
+
+
+def compare_versions(version1: str, version2: str) -> int:
+    """Compara dos versiones semánticas x.y.z devolviendo 1, 0, -1."""
+    v1, v2 = _version_tuple(version1), _version_tuple(version2)
+    if v1 is None or v2 is None:
         # Si el formato no es numérico, se considera iguales para no forzar actualización incorrecta
         return 0
-    while len(v1_parts) < 3:
-        v1_parts.append(0)
-    while len(v2_parts) < 3:
-        v2_parts.append(0)
-    for a, b in zip(v1_parts[:3], v2_parts[:3]):
-        if a > b:
-            return 1
-        if a < b:
-            return -1
-    return 0
-
+    return (v1 > v2) - (v1 < v2)
 
-class UpdateChecker(QThread):
-    update_available = Signal(str)
 
-    def run(self):
-        try:
-            api_url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-            response = requests.get(api_url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                latest_version = data.get('tag_name', '').lstrip('v')
-                if latest_version and compare_versions(latest_version, APP_VERSION) > 0:
-                    self.update_available.emit(latest_version)
-            # 404 u otros códigos se ignoran silenciosamente aquí (ya se manejan en verificación manual)
-        except (requests.RequestException, ValueError, KeyError):
-            pass
+def _is_transient_failure(reply) -> bool:
+    """Indica si merece la pena reintentar: 502/503/504 o una conexión caída antes de responder.
+    Los timeouts no se reintentan para no superar el tiempo total previsto."""
+    from PySide6.QtNetwork import QNetworkReply, QNetworkRequest
+    status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+    if status_code is not None:
+        return status_code in _RETRY_HTTP_STATUS
+    return reply.error() in (QNetworkReply.RemoteHostClosedError,
+                             QNetworkReply.TemporaryNetworkFailureError,
+                             QNetworkReply.NetworkSessionFailedError)
 
 
-class ManualUpdateChecker(QThread):
-    finished_check = Signal(object)  # dict con claves: status, latest_version, error(optional)
-
-    def run(self):
+def _parse_release_reply(reply, cached_version: str) -> dict:
+    """Interpreta la respuesta de la API de releases como dict con claves: status, latest_version, etag(optional), error(optional)"""
+    from PySide6.QtNetwork import QNetworkRequest
+    status_code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+    if status_code is None:
+        # Sin respuesta HTTP: error de red, timeout o petición abortada
+        return {'status': 'error', 'error': reply.errorString()}
+    if status_code == 304:
+        # La release no ha cambiado: reutilizar la versión en caché sin parsear JSON
+        return {'status': 'ok', 'latest_version': cached_version}
+    if status_code == 200:
         try:
-            api_url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-            response = requests.get(api_url, timeout=8)
-            if response.status_code == 200:
-                data = response.json()
-                latest_version = data.get('tag_name', '').lstrip('v')
-                if latest_version:
-                    self.finished_check.emit({
-                        'status': 'ok',
-                        'latest_version': latest_version
-                    })
-                else:
-                    self.finished_check.emit({
-                        'status': 'error',
-                        'error': 'Formato de release inválido'
-                    })
-            elif response.status_code == 404:
-                self.finished_check.emit({'status': 'no_releases'})
-            else:
-                self.finished_check.emit({
-                    'status': 'error',
-                    'error': f"Código HTTP {response.status_code}"
-                })
-        except (requests.RequestException, ValueError, KeyError) as e:
-            self.finished_check.emit({'status': 'error', 'error': str(e)})
+            data = json.loads(bytes(reply.readAll()))
+            latest_version = data.get('tag_name', '').lstrip('v')
+        except (ValueError, AttributeError) as e:
+            return {'status': 'error', 'error': str(e)}
+        if latest_version:
+            return {
+                'status': 'ok',
+                'latest_version': latest_version,
+                'etag': bytes(reply.rawHeader(b"ETag")).decode("ascii", "ignore")
+            }
+        return {'status': 'error', 'error': 'Formato de release inválido'}
+    if status_code == 404:
+        return {'status': 'no_releases'}
+    return {'status': 'error', 'error': f"Código HTTP {status_code}"}
 
 class ModernButton(QPushButton):
-    def __init__(self, text, bg_color="#2196F3", hover_color="#1976D2", text_color="white", parent=None):
+    """Botón con el estilo común de la aplicación; el color lo fija styles.qss según `variant`
+    (primary, success, danger, warning o secondary)."""
+
+    def __init__(self, text, variant="primary", parent=None):
         super().__init__(text, parent)
         self.setFixedHeight(40)
         self.setCursor(Qt.PointingHandCursor)
-        self.bg_color = bg_color
-        self.hover_color = hover_color
-        self.text_color = text_color
-        self._apply_style()
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(10)
-        shadow.setColor(QColor(0, 0, 0, 50))
-        shadow.setOffset(0, 2)
-        self.setGraphicsEffect(shadow)
-
-    def _apply_style(self):
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {self.bg_color};
-                color: {self.text_color};
-                border: none;
-                border-radius: 5px;
-                font-size: 14px;
-                font-weight: bold;
-                padding: 8px 16px;
-            }}
-            QPushButton:hover {{
-                background-color: {self.hover_color};
-            }}
-            QPushButton:pressed {{
-                background-color: {self.hover_color};
-                padding-top: 10px;
-            }}
-            QPushButton:disabled {{
-                background-color: #CCCCCC;
-                color: #888888;
-            }}
-        """)
+        self.setProperty("modern", True)
+        self.setProperty("variant", variant)
+
+
+class _ProxyOpSignals(QObject):
+    """Señales de _ProxyOp: se emiten desde el hilo del pool y llegan encoladas al hilo de la UI."""
+    done = Signal(bool, str)
+
+
+class _ProxyOp(QRunnable):
+    """Aplica un cambio de proxy (registro + aviso a WinINET) fuera del hilo de la UI."""
+
+    def __init__(self, work, enable, proxy_server=""):
+        super().__init__()
+        self.work = work
+        self.enable = enable
+        self.proxy_server = proxy_server
+        self.signals = _ProxyOpSignals()
+
+    def run(self):
+        try:
+            self.work()
+        except Exception as e:
+            # Cualquier error debe llegar a la UI; si no, la operación quedaría en curso para siempre
+            self.signals.done.emit(False, str(e))
+        else:
+            self.signals.done.emit(True, "")
+
+
+class _RegistryWatcher(QThread):
+    """Espera en segundo plano (sin sondeo) cambios en los valores de una clave del registro
+    y emite `changed` cada vez que alguien, este u otro proceso, los modifica."""
+    changed = Signal()
+
+    def __init__(self, key, parent=None):
+        super().__init__(parent)
+        self._hkey = key.handle
+        # Evento que señala RegNotifyChangeKeyValue y evento para detener el hilo (ver stop)
+        self._change_event = _kernel32.CreateEventW(None, False, False, None)
+        self._stop_event = _kernel32.CreateEventW(None, False, False, None)
+        if not (self._change_event and self._stop_event):
+            log.warning("Error watching proxy settings: %s", ctypes.WinError(ctypes.get_last_error()))
+
+    def run(self):
+        if not (self._change_event and self._stop_event):
+            return
+        handles = (ctypes.c_void_p * 2)(self._change_event, self._stop_event)
+        if not self._arm():
+            return
+        while True:
+            result = _kernel32.WaitForMultipleObjects(2, handles, False, INFINITE)
+            if result == WAIT_OBJECT_0 + 1:
+                # Evento de parada (stop)
+                return
+            if result != WAIT_OBJECT_0:
+                log.warning("Error watching proxy settings: %s", ctypes.WinError(ctypes.get_last_error()))
+                return
+            # Volver a registrar la notificación (solo se dispara una vez) antes de avisar, para que
+            # una escritura posterior a la lectura del estado despierte de nuevo al hilo
+            if not self._arm():
+                return
+            self.changed.emit()
+
+    def _arm(self):
+        """Registra RegNotifyChangeKeyValue sobre la clave; devuelve False si falla"""
+        error = _advapi32.RegNotifyChangeKeyValue(self._hkey, False, REG_NOTIFY_CHANGE_LAST_SET,
+                                                  self._change_event, True)
+        if error:
+            log.warning("Error watching proxy settings: %s", ctypes.WinError(error))
+            return False
+        return True
+
+    def stop(self):
+        """Detiene el hilo, espera a que termine y libera los eventos"""
+        if self._stop_event:
+            _kernel32.SetEvent(self._stop_event)
+        self.wait()
+        for event in (self._change_event, self._stop_event):
+            if event:
+                _kernel32.CloseHandle(event)
+        self._change_event = self._stop_event = None
 
 
 class SettingsDialog(QDialog):
@@ -145,38 +266,7 @@ class SettingsDialog(QDialog):
         self.port_input = None
         self.result_value = QDialog.Rejected
         self.parent_widget = parent
-        
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #FAFAFA;
-                border: none;
-                border-radius: 10px;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 1px solid #E0E0E0;
-                border-radius: 5px;
-                margin-top: 15px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px;
-            }
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #E0E0E0;
-                border-radius: 4px;
-                background-color: white;
-            }
-            QLineEdit:focus {
-                border: 1px solid #2196F3;
-            }
-            QLabel {
-                font-size: 13px;
-            }
-        """)
+        self.setObjectName("settingsDialog")
         
         # Construir la interfaz
         self.setup_ui()
@@ -205,42 +295,19 @@ class SettingsDialog(QDialog):
         
         # Barra de título personalizada
         title_bar = QFrame()
-        title_bar.setStyleSheet("""
-            QFrame {
-                background-color: #2196F3;
-                border-top-left-radius: 10px;
-                border-top-right-radius: 10px;
-                border: none;
-            }
-        """)
+        title_bar.setObjectName("titleBar")
         title_bar.setFixedHeight(35)
         title_bar_layout = QHBoxLayout(title_bar)
         title_bar_layout.setContentsMargins(10, 0, 10, 0)
         
         # Título
         title_label = QLabel("Configuración de Proxy")
-        title_label.setStyleSheet("""
-            color: white;
-            font-weight: bold;
-            font-size: 14px;
-        """)
+        title_label.setObjectName("titleLabel")
         
         # Botón de cerrar
         close_button = QPushButton("✕")
         close_button.setFixedSize(20, 20)
-        close_button.setStyleSheet("""
-            QPushButton {
-                color: white;
-                background-color: transparent;
-                border: none;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #e81123;
-                border-radius: 10px;
-            }
-        """)
+        close_button.setObjectName("closeButton")
         close_button.clicked.connect(self.reject)
         
         title_bar_layout.addWidget(title_label)
@@ -249,7 +316,7 @@ class SettingsDialog(QDialog):
         
         # Contenedor para el contenido
         content_container = QWidget()
-        content_container.setStyleSheet("background: #FFFFFF; border: none;")
+        content_container.setObjectName("dialogContent")
         content_layout = QVBoxLayout(content_container)
         content_layout.setContentsMargins(20, 20, 20, 20)
         content_layout.setSpacing(15)
@@ -262,8 +329,9 @@ class SettingsDialog(QDialog):
         
         # IP address
         self.ip_input = QLineEdit(self.proxy_ip)
-        self.ip_input.setPlaceholderText("Ej: 127.0.0.1")
-        group_layout.addRow("Dirección IP:", self.ip_input)
+        self.ip_input.setValidator(QRegularExpressionValidator(PROXY_HOST_REGEX, self))
+        self.ip_input.setPlaceholderText("Ej: 127.0.0.1 o proxy.local")
+        group_layout.addRow("Servidor (IP o host):", self.ip_input)
         
         # Port
         self.port_input = QLineEdit(self.proxy_port)
@@ -278,9 +346,9 @@ class SettingsDialog(QDialog):
         # Buttons
         button_layout = QHBoxLayout()
         button_layout.setSpacing(10)
-        cancel_button = ModernButton("Cancelar", "#e0e0e0", "#bdbdbd", "#222222", self)
+        cancel_button = ModernButton("Cancelar", "secondary", self)
         cancel_button.clicked.connect(self.reject)
-        save_button = ModernButton("Guardar", "#2196F3", "#1976D2", "white", self)
+        save_button = ModernButton("Guardar", "primary", self)
         save_button.clicked.connect(self.accept)
         button_layout.addWidget(cancel_button)
         button_layout.addWidget(save_button)
@@ -291,6 +359,13 @@ class SettingsDialog(QDialog):
         main_layout.addWidget(content_container)
     
     def accept(self):
+        # Los validadores impiden que lleguen datos inválidos; no cerrar hasta que sean aceptables
+        for w in (self.ip_input, self.port_input):
+            if not w.hasAcceptableInput():
+                # Señalar el primer campo que falta corregir
+                w.setFocus()
+                w.selectAll()
+                return
         self.proxy_ip = self.ip_input.text().strip()
         self.proxy_port = self.port_input.text().strip()
         self.result_value = QDialog.Accepted
@@ -305,9 +380,13 @@ class SettingsDialog(QDialog):
 
 
 class ProxyManager(QMainWindow):
+    # Mensaje fijo al deshabilitar el proxy
+    DISABLED_MESSAGE = "<h3>Proxy Desactivado</h3><p>La configuración de proxy ha sido deshabilitada correctamente.</p>"
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Simple Proxy Manager")
+        self.setObjectName("proxyManager")
         self.setMinimumSize(450, 300)
         # Quitar el marco estándar de la ventana
         self.setWindowFlags(Qt.FramelessWindowHint)
@@ -321,58 +400,148 @@ class ProxyManager(QMainWindow):
         # Inicializar configuraciones
         self.settings = QSettings("ProxyManager", "SimpleProxyApp")
 
+        # Abrir una sola vez la clave de Internet Settings, para consultar el estado y para escribirlo
+        self._inet_key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, _INET_SUBKEY, 0, winreg.KEY_READ | winreg.KEY_WRITE)
+
+        # Cliente HTTP asíncrono para verificar actualizaciones (se crea al primer uso)
+        self._nam = None
+
+        # QMessageBox reutilizable para los avisos informativos (ver _info)
+        self._info_box = None
+
+        # Operación de habilitar/deshabilitar en curso en el QThreadPool (ver _start_proxy_op)
+        self._proxy_op = None
+        # Se activa en closeEvent para no mostrar avisos de operaciones terminadas al cerrar
+        self._closing = False
+        # Agrupa clics rápidos de habilitar/deshabilitar en un único cambio con el último estado pedido
+        self._pending_state = None
+        self._apply_timer = QTimer(self)
+        self._apply_timer.setSingleShot(True)
+        self._apply_timer.setInterval(150)
+        self._apply_timer.timeout.connect(self._apply_pending)
+
         # Atributos para verificación manual de actualizaciones
-        self._manual_update_thread = None
+        self._manual_reply = None
         self._wait_dialog = None
         
-        # Intentar establecer el icono de la ventana
-        try:
-            window_icon_path = str(Path(__file__).parent / "icon.ico")
-            self.setWindowIcon(QIcon(window_icon_path))
-        except (FileNotFoundError, OSError):
-            pass
-            
-        # Aplicar estilo global a la aplicación
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #FAFAFA;
-                border: none;
-                border-radius: 10px;
-            }
-            QWidget {
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-            QLabel {
-                color: #333333;
-            }
-        """)
-        
         # Comprobar actualizaciones
         self.check_for_updates()
         
         # Load settings
-        self.proxy_ip = self.settings.value("proxy_ip", "127.0.0.1")
-        self.proxy_port = self.settings.value("proxy_port", "8080")
+        self._set_proxy_address(self.settings.value("proxy_ip", "127.0.0.1"),
+                                self.settings.value("proxy_port", "8080"))
         
         # Check current proxy status
-        self.proxy_enabled = self.is_proxy_enabled()
+        self.proxy_enabled, self.active_proxy_server = self._read_proxy_state()
         
+        # Fuentes de las etiquetas de estado (se construyen una vez y se reutilizan)
+        self._font_status = QFont("Segoe UI", 14)
+        self._font_status.setBold(True)
+        self._font_proxy_info = QFont("Segoe UI", 12)
+        # Último estado aplicado a status_label, para no repulir su estilo si no cambia
+        self._status_shown = None
+
         # Create UI
         self.setup_ui()
         
         # Update UI state based on proxy status
         self.update_ui_state()
+
+        # Mantener el estado al día si la configuración de proxy cambia fuera de la aplicación
+        self._registry_watcher = _RegistryWatcher(self._inet_key, self)
+        self._registry_watcher.changed.connect(self._on_registry_changed)
+        self._registry_watcher.start()
     
     def check_for_updates(self):
         """Inicia el proceso de verificación de actualizaciones en segundo plano"""
-        # Inicializar el objeto de configuración en caso de que aún no se haya hecho
-        if not hasattr(self, 'settings'):
-            self.settings = QSettings("ProxyManager", "SimpleProxyApp")
-            
-        self.update_checker = UpdateChecker()
-        self.update_checker.update_available.connect(self.on_update_available)
-        self.update_checker.start()
+        # Si la última consulta es reciente, usar la versión en caché sin consultar GitHub
+        last_check = self.settings.value("last_check_epoch", 0, type=int)
+        cached_version = self.settings.value("latest_version", "")
+        if cached_version and time.time() - last_check < UPDATE_CHECK_TTL:
+            if compare_versions(cached_version, APP_VERSION) > 0:
+                QTimer.singleShot(0, lambda: self.on_update_available(cached_version))
+            return
+
+        self._start_check(manual=False)
+
+    def _network_manager(self):
+        """Devuelve el QNetworkAccessManager, importando QtNetwork solo cuando hay que consultar GitHub"""
+        if self._nam is None:
+            from PySide6.QtNetwork import QNetworkAccessManager
+            self._nam = QNetworkAccessManager(self)
+        return self._nam
+
+    def _start_check(self, manual: bool, attempt: int = 0):
+        """Lanza la petición a la API de releases sin bloquear la UI y devuelve la respuesta en curso"""
+        from PySide6.QtNetwork import QNetworkRequest
+        etag, cached_version = self._cached_release()
+        request = QNetworkRequest(QUrl(RELEASES_API_URL))
+        request.setRawHeader(b"Accept", b"application/vnd.github+json")
+        request.setHeader(QNetworkRequest.UserAgentHeader, f"ProxyManager/{APP_VERSION}")
+        # Accept-Encoding no se fija a mano: QNAM ya negocia gzip y descomprime solo si lo gestiona él
+        if etag and cached_version:
+            request.setRawHeader(b"If-None-Match", etag.encode("ascii", "ignore"))
+        request.setTransferTimeout(8000 if manual else 5000)
+        reply = self._network_manager().get(request)
+        reply.finished.connect(lambda: self._on_reply(reply, manual, cached_version, attempt))
+        return reply
+
+    def _on_reply(self, reply, manual: bool, cached_version: str, attempt: int):
+        # Ignorar respuestas de verificaciones manuales canceladas
+        if manual and reply is not self._manual_reply:
+            reply.deleteLater()
+            return
+        if attempt < UPDATE_CHECK_RETRIES and _is_transient_failure(reply):
+            QTimer.singleShot(UPDATE_CHECK_BACKOFF_MS, lambda: self._retry_check(reply, manual, attempt + 1))
+            return
+        reply.deleteLater()
+        if manual:
+            self._manual_reply = None
+        result = _parse_release_reply(reply, cached_version)
+        result['manual'] = manual
+        self._on_release_checked(result)
     
+    def _retry_check(self, previous, manual: bool, attempt: int):
+        previous.deleteLater()
+        # Si el usuario canceló durante la espera, _manual_reply ya no apunta a la respuesta fallida
+        if manual and previous is not self._manual_reply:
+            return
+        reply = self._start_check(manual, attempt)
+        if manual:
+            self._manual_reply = reply
+
+    def _cached_release(self):
+        """Devuelve (etag, versión) de la última respuesta 200 de la API de releases"""
+        return (self.settings.value("release_etag", ""),
+                self.settings.value("latest_version", ""))
+
+    def _store_release(self, etag, latest_version):
+        """Guarda la versión (caché con TTL) y, si la respuesta lo trae, el ETag para If-None-Match"""
+        if not latest_version:
+            return
+        self.settings.setValue("latest_version", latest_version)
+        if etag:
+            self.settings.setValue("release_etag", etag)
+        else:
+            # Un ETag anterior ya no corresponde a esta versión
+            self.settings.remove("release_etag")
+
+    def _on_release_checked(self, result: dict):
+        """Procesa el resultado de cualquier verificación y lo despacha según su modo"""
+        if result['status'] == 'ok':
+            self.settings.setValue("last_check_epoch", int(time.time()))
+        if 'etag' in result:
+            self._store_release(result['etag'], result['latest_version'])
+        if result['manual']:
+            self._on_manual_update_finished(result)
+            return
+        # En la verificación automática no se molesta al usuario: los errores solo se registran
+        if result['status'] == 'error':
+            log.warning("Error checking for updates: %s", result.get('error'))
+        latest = result.get('latest_version')
+        if result['status'] == 'ok' and compare_versions(latest, APP_VERSION) > 0:
+            self.on_update_available(latest)
+
     def on_update_available(self, new_version):
         """Procesa una actualización disponible y muestra la notificación si es necesario"""
         # Comprobar si el usuario ha elegido omitir esta versión
@@ -396,25 +565,8 @@ class ProxyManager(QMainWindow):
         skip_checkbox = QCheckBox("No volver a mostrar para esta versión")
         msg.setCheckBox(skip_checkbox)
         
-        # Aplicar estilos al mensaje
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: #FAFAFA;
-            }
-            QPushButton {
-                padding: 6px 12px;
-                border-radius: 4px;
-                font-weight: bold;
-                background-color: #2196F3;
-                color: white;
-            }
-            QPushButton:hover {
-                background-color: #1976D2;
-            }
-            QCheckBox {
-                color: #555555;
-            }
-        """)
+        # Estilo propio del aviso (ver QMessageBox#updatePrompt en styles.qss)
+        msg.setObjectName("updatePrompt")
         result = msg.exec()
 
         # Si el usuario marcó la casilla, guardar la preferencia
@@ -424,26 +576,37 @@ class ProxyManager(QMainWindow):
         if result == QMessageBox.Yes:
             # Abrir el navegador en la página de releases del repositorio
             url = f"https://github.com/{GITHUB_REPO}/releases/latest"
-            try:
-                subprocess.Popen(["start", url], shell=True)
+            # Abrir con el navegador predeterminado directamente, sin lanzar cmd.exe
+            opened = QDesktopServices.openUrl(QUrl(url))
+            if not opened:
+                try:
+                    os.startfile(url)
+                    opened = True
+                except OSError:
+                    pass
 
+            if opened:
                 # Mostrar mensaje de confirmación
-                confirm_msg = QMessageBox(self)
-                confirm_msg.setWindowTitle("Actualización en Curso")
-                confirm_msg.setText("Se ha abierto el navegador para descargar la nueva versión.")
-                confirm_msg.setInformativeText("Recuerda cerrar esta aplicación antes de instalar la actualización.")
-                confirm_msg.setIcon(QMessageBox.Information)
-                confirm_msg.exec()
-
-            except (OSError, subprocess.SubprocessError):
+                self._info("Actualización en Curso",
+                           "Se ha abierto el navegador para descargar la nueva versión.",
+                           informative="Recuerda cerrar esta aplicación antes de instalar la actualización.")
+            else:
                 # Si hay algún error al abrir el navegador, mostrar la URL
-                fallback_msg = QMessageBox(self)
-                fallback_msg.setWindowTitle("Enlace de Descarga")
-                fallback_msg.setText("Visita la siguiente URL para descargar la nueva versión:")
-                fallback_msg.setInformativeText(url)
-                fallback_msg.setIcon(QMessageBox.Information)
-                fallback_msg.exec()
+                self._info("Enlace de Descarga",
+                           "Visita la siguiente URL para descargar la nueva versión:",
+                           informative=url)
     
+    def _info(self, title, text, icon=QMessageBox.Information, informative=""):
+        """Muestra un aviso modal reutilizando una única instancia de QMessageBox"""
+        if self._info_box is None or self._info_box.isVisible():
+            # Crear una nueva solo la primera vez o si la anterior sigue abierta (exec anidado)
+            self._info_box = QMessageBox(self)
+        self._info_box.setWindowTitle(title)
+        self._info_box.setText(text)
+        self._info_box.setInformativeText(informative)
+        self._info_box.setIcon(icon)
+        self._info_box.exec()
+
     def mousePressEvent(self, event):
         # Permitir mover la ventana al hacer clic y arrastrar
         if event.button() == Qt.LeftButton:
@@ -459,11 +622,32 @@ class ProxyManager(QMainWindow):
     def mouseReleaseEvent(self, _):
         # Resetear la posición de arrastre
         self._drag_position = None
+
+    def closeEvent(self, event):
+        # closeEvent puede llegar dos veces (cierre de ventana y salida de la aplicación): liberar una sola vez
+        if self._closing:
+            super().closeEvent(event)
+            return
+        # Los resultados que lleguen a partir de ahora ya no se muestran (ver _on_proxy_op_done)
+        self._closing = True
+        pool = QThreadPool.globalInstance()
+        if self._apply_timer.isActive():
+            # Aplicar antes de cerrar la última petición de habilitar/deshabilitar que seguía en espera
+            self._apply_timer.stop()
+            pool.waitForDone()
+            self._proxy_op = None
+            self._apply_pending()
+        # Esperar a que termine un cambio de proxy en curso y liberar la clave del registro abierta en __init__
+        pool.waitForDone()
+        self._registry_watcher.stop()
+        winreg.CloseKey(self._inet_key)
+        self._inet_key = None
+        super().closeEvent(event)
     
     def check_updates_manually(self):
         """Verifica actualizaciones manualmente (asíncrono) evitando congelar la UI"""
         # Evitar lanzar múltiples verificaciones simultáneas
-        if self._manual_update_thread and self._manual_update_thread.isRunning():
+        if self._manual_reply is not None:
             return
         # Crear diálogo de progreso cancelable
         from PySide6.QtWidgets import QProgressDialog
@@ -474,16 +658,12 @@ class ProxyManager(QMainWindow):
         self._wait_dialog.canceled.connect(self._cancel_manual_update)
         self._wait_dialog.show()
 
-        # Lanzar hilo
-        self._manual_update_thread = ManualUpdateChecker()
-        self._manual_update_thread.finished_check.connect(self._on_manual_update_finished)
-        self._manual_update_thread.start()
+        # Lanzar petición asíncrona
+        self._manual_reply = self._start_check(manual=True)
 
     def _on_manual_update_finished(self, result: dict):
         # Cerrar cuadro de progreso si existe
-        if self._wait_dialog:
-            self._wait_dialog.close()
-            self._wait_dialog = None
+        self._close_wait_dialog()
 
         status = result.get('status')
         if status == 'ok':
@@ -492,43 +672,32 @@ class ProxyManager(QMainWindow):
                 self.settings.remove("skip_update_version")
                 self.show_update_notification(latest)
             else:
-                no_updates_msg = QMessageBox(self)
-                no_updates_msg.setWindowTitle("No Hay Actualizaciones")
-                no_updates_msg.setText(f"Ya estás utilizando la última versión: v{APP_VERSION}")
-                no_updates_msg.setIcon(QMessageBox.Information)
-                no_updates_msg.exec()
+                self._info("No Hay Actualizaciones", f"Ya estás utilizando la última versión: v{APP_VERSION}")
         elif status == 'no_releases':
-            no_rel = QMessageBox(self)
-            no_rel.setWindowTitle("Sin Releases")
-            no_rel.setText("El repositorio no tiene releases publicadas todavía.")
-            no_rel.setInformativeText("Crea una release en GitHub para habilitar la comprobación de versiones.")
-            no_rel.setIcon(QMessageBox.Information)
-            no_rel.exec()
+            self._info("Sin Releases",
+                       "El repositorio no tiene releases publicadas todavía.",
+                       informative="Crea una release en GitHub para habilitar la comprobación de versiones.")
         else:
-            error_msg = QMessageBox(self)
-            error_msg.setWindowTitle("Error")
-            error_msg.setText("No se pudo verificar si hay actualizaciones disponibles")
-            error_msg.setInformativeText(f"Error: {result.get('error', 'Desconocido')}")
-            error_msg.setIcon(QMessageBox.Warning)
-            error_msg.exec()
-
-        # Liberar referencia del hilo
-        self._manual_update_thread = None
+            self._info("Error",
+                       "No se pudo verificar si hay actualizaciones disponibles",
+                       QMessageBox.Warning,
+                       f"Error: {result.get('error', 'Desconocido')}")
 
     def _cancel_manual_update(self):
-        if self._manual_update_thread and self._manual_update_thread.isRunning():
-            # No hay una forma directa y segura de matar el hilo de requests; marcamos cancelación lógica.
-            # Simplemente ignoraremos el resultado cuando llegue si el usuario canceló.
-            self._manual_update_thread.finished_check.disconnect(self._on_manual_update_finished)
+        reply, self._manual_reply = self._manual_reply, None
+        if reply is not None:
+            # Abortar libera el socket en el acto; _on_reply descarta su finished() porque ya no es la respuesta actual
+            reply.abort()
+        self._close_wait_dialog()
+        # Aviso breve en la barra de estado, sin abrir otra ventana
+        self.status_bar.showMessage("Verificación cancelada.", 3000)
+
+    def _close_wait_dialog(self):
         if self._wait_dialog:
+            # QProgressDialog emite canceled() al cerrarse; desconectar para no tratarlo como cancelación
+            self._wait_dialog.canceled.disconnect(self._cancel_manual_update)
             self._wait_dialog.close()
             self._wait_dialog = None
-        # Mostrar mensaje de cancelación (opcional)
-        cancel_msg = QMessageBox(self)
-        cancel_msg.setWindowTitle("Cancelado")
-        cancel_msg.setText("La verificación de actualizaciones fue cancelada.")
-        cancel_msg.setIcon(QMessageBox.Information)
-        cancel_msg.exec()
     
     def setup_ui(self):
         # Main widget and layout
@@ -539,59 +708,24 @@ class ProxyManager(QMainWindow):
         
         # Barra de título personalizada
         title_bar = QFrame()
-        title_bar.setStyleSheet("""
-            QFrame {
-                background-color: #2196F3;
-                border-top-left-radius: 10px;
-                border-top-right-radius: 10px;
-                border: none;
-            }
-        """)
+        title_bar.setObjectName("titleBar")
         title_bar.setFixedHeight(35)
         title_bar_layout = QHBoxLayout(title_bar)
         title_bar_layout.setContentsMargins(10, 0, 10, 0)
         
         # Título
         title_label = QLabel("Simple Proxy Manager")
-        title_label.setStyleSheet("""
-            color: white;
-            font-weight: bold;
-            font-size: 14px;
-        """)
+        title_label.setObjectName("titleLabel")
         
         # Botones de la barra de título
         close_button = QPushButton("✕")
         close_button.setFixedSize(20, 20)
-        close_button.setStyleSheet("""
-            QPushButton {
-                color: white;
-                background-color: transparent;
-                border: none;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #e81123;
-                border-radius: 10px;
-            }
-        """)
+        close_button.setObjectName("closeButton")
         close_button.clicked.connect(self.close)
         
         minimize_button = QPushButton("−")
         minimize_button.setFixedSize(20, 20)
-        minimize_button.setStyleSheet("""
-            QPushButton {
-                color: white;
-                background-color: transparent;
-                border: none;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 255, 255, 0.2);
-                border-radius: 10px;
-            }
-        """)
+        minimize_button.setObjectName("minimizeButton")
         minimize_button.clicked.connect(self.showMinimized)
         
         title_bar_layout.addWidget(title_label)
@@ -602,15 +736,9 @@ class ProxyManager(QMainWindow):
         # Crear contenedor con sombra
         container = QFrame()
         container.setFrameShape(QFrame.StyledPanel)
-        container.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                border: 1px solid #E0E0E0;
-            }
-        """)
+        container.setObjectName("card")
         
-        # Aplicar sombra al contenedor
+        # Aplicar sombra al contenedor (único QGraphicsEffect de la ventana; los botones usan un borde inferior en styles.qss)
         shadow = QGraphicsDropShadowEffect(container)
         shadow.setBlurRadius(20)
         shadow.setColor(QColor(0, 0, 0, 40))
@@ -624,37 +752,36 @@ class ProxyManager(QMainWindow):
         
         # Status label con un estilo más moderno
         self.status_label = QLabel()
+        self.status_label.setObjectName("statusLabel")
         self.status_label.setAlignment(Qt.AlignCenter)
-        font = QFont("Segoe UI", 14)
-        font.setBold(True)
-        self.status_label.setFont(font)
+        self.status_label.setFont(self._font_status)
         
         # Current proxy info con estilo mejorado
         self.proxy_info_label = QLabel()
         self.proxy_info_label.setAlignment(Qt.AlignCenter)
-        proxy_font = QFont("Segoe UI", 12)
-        self.proxy_info_label.setFont(proxy_font)
+        self.proxy_info_label.setObjectName("proxyInfoLabel")
+        self.proxy_info_label.setFont(self._font_proxy_info)
         
         # Separador
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
         separator.setFrameShadow(QFrame.Sunken)
-        separator.setStyleSheet("background-color: #E0E0E0;")
+        separator.setObjectName("separator")
         
         # Buttons con estilos modernos y mejores colores
         button_layout = QHBoxLayout()
         button_layout.setSpacing(15)
         
-        self.connect_button = ModernButton("CONECTAR", "#4CAF50", "#388E3C")
+        self.connect_button = ModernButton("CONECTAR", "success")
         self.connect_button.clicked.connect(self.enable_proxy)
         
-        self.disconnect_button = ModernButton("DESCONECTAR", "#F44336", "#D32F2F")
+        self.disconnect_button = ModernButton("DESCONECTAR", "danger")
         self.disconnect_button.clicked.connect(self.disable_proxy)
         
         button_layout.addWidget(self.connect_button)
         button_layout.addWidget(self.disconnect_button)
         
-        settings_button = ModernButton("CONFIGURACIÓN", "#2196F3", "#1976D2")
+        settings_button = ModernButton("CONFIGURACIÓN", "primary")
         settings_button.clicked.connect(self.open_settings)
         
         # Add widgets to container layout
@@ -665,9 +792,15 @@ class ProxyManager(QMainWindow):
         container_layout.addWidget(settings_button)
         
         # Botón para verificar actualizaciones
-        check_updates_button = ModernButton("VERIFICAR ACTUALIZACIONES", "#FF9800", "#F57C00")
+        check_updates_button = ModernButton("VERIFICAR ACTUALIZACIONES", "warning")
         check_updates_button.clicked.connect(self.check_updates_manually)
         container_layout.addWidget(check_updates_button)
+
+        # Barra de estado dentro del contenedor (la ventana no tiene marco ni fondo propio)
+        self.status_bar = QStatusBar()
+        self.status_bar.setSizeGripEnabled(False)
+        self.status_bar.setObjectName("statusBar")
+        container_layout.addWidget(self.status_bar)
         
         # Add title bar and container to main layout
         main_layout.addWidget(title_bar)
@@ -677,54 +810,45 @@ class ProxyManager(QMainWindow):
         self.setCentralWidget(main_widget)
     
     def update_ui_state(self):
-        # Update status label
-        if self.proxy_enabled:
-            self.status_label.setText("CONECTADO")
-            self.status_label.setStyleSheet("""
-                color: #4CAF50;
-                background-color: #E8F5E9;
-                border-radius: 5px;
-                padding: 8px;
-                font-weight: bold;
-            """)
+        # Update status label (solo cuando cambia, para no repulir el estilo en cada llamada)
+        if self.proxy_enabled != self._status_shown:
+            self._status_shown = self.proxy_enabled
+            self.status_label.setText("CONECTADO" if self.proxy_enabled else "DESCONECTADO")
+            # styles.qss colorea la etiqueta según la propiedad "connected"
+            self.status_label.setProperty("connected", self.proxy_enabled)
+            self.status_label.style().unpolish(self.status_label)
+            self.status_label.style().polish(self.status_label)
+        
+        # Update proxy info: si el proxy está activo, mostrar el servidor realmente configurado en el sistema
+        if self.proxy_enabled and self.active_proxy_server:
+            self.proxy_info_label.setText(f"Proxy: {self.active_proxy_server}")
         else:
-            self.status_label.setText("DESCONECTADO")
-            self.status_label.setStyleSheet("""
-                color: #F44336;
-                background-color: #FFEBEE;
-                border-radius: 5px;
-                padding: 8px;
-                font-weight: bold;
-            """)
-        
-        # Update proxy info with better styling
-        self.proxy_info_label.setText(f"Proxy: {self.proxy_ip}:{self.proxy_port}")
-        self.proxy_info_label.setStyleSheet("""
-            color: #555555;
-            padding: 10px;
-            background-color: #F5F5F5;
-            border-radius: 5px;
-        """)
-        
-        # Update button states with smooth transition
-        self.connect_button.setEnabled(not self.proxy_enabled)
-        self.disconnect_button.setEnabled(self.proxy_enabled)
+            self.proxy_info_label.setText(f"Proxy: {self.proxy_server}")
+        
+        # Update button states (ambos deshabilitados mientras se aplica un cambio)
+        busy = self._proxy_op is not None
+        self.connect_button.setEnabled(not busy and not self.proxy_enabled)
+        self.disconnect_button.setEnabled(not busy and self.proxy_enabled)
+    
+    def _set_proxy_address(self, proxy_ip, proxy_port):
+        """Guarda la IP y el puerto (ya validados por SettingsDialog) y el valor "ip:puerto" de ProxyServer"""
+        self.proxy_ip = proxy_ip
+        self.proxy_port = proxy_port
+        # Un literal IPv6 va entre corchetes para poder separarlo del puerto
+        host = f"[{proxy_ip}]" if ":" in proxy_ip and not proxy_ip.startswith("[") else proxy_ip
+        self.proxy_server = f"{host}:{proxy_port}"
     
     def open_settings(self):
-        settings = QSettings("ProxyManager", "SimpleProxyApp")
-        current_ip = settings.value("proxy_ip", "127.0.0.1")
-        current_port = settings.value("proxy_port", "8080")
-        dlg = SettingsDialog(self, current_ip, current_port)
+        dlg = SettingsDialog(self, self.proxy_ip, self.proxy_port)
         dlg.adjustSize()
         # Centrar respecto a la ventana principal
         parent_geom = self.frameGeometry()
         g = dlg.frameGeometry()
         dlg.move(parent_geom.center().x() - g.width() // 2, parent_geom.center().y() - g.height() // 2)
         if dlg.exec() == QDialog.Accepted:
-            settings.setValue("proxy_ip", dlg.proxy_ip)
-            settings.setValue("proxy_port", dlg.proxy_port)
-            self.proxy_ip = dlg.proxy_ip
-            self.proxy_port = dlg.proxy_port
+            self.settings.setValue("proxy_ip", dlg.proxy_ip)
+            self.settings.setValue("proxy_port", dlg.proxy_port)
+            self._set_proxy_address(dlg.proxy_ip, dlg.proxy_port)
             self.update_ui_state()
     
     def on_settings_dialog_finished(self, _):
@@ -733,181 +857,169 @@ class ProxyManager(QMainWindow):
         
         if result_value == QDialog.Accepted:
             # Guardar la configuración
-            settings = QSettings("ProxyManager", "SimpleProxyApp")
-            settings.setValue("proxy_ip", proxy_ip)
-            settings.setValue("proxy_port", proxy_port)
+            self.settings.setValue("proxy_ip", proxy_ip)
+            self.settings.setValue("proxy_port", proxy_port)
             
             # Actualizar variables locales
-            self.proxy_ip = proxy_ip
-            self.proxy_port = proxy_port
+            self._set_proxy_address(proxy_ip, proxy_port)
             
             # Actualizar UI
             self.update_ui_state()
     
-    def is_proxy_enabled(self):
+    def _read_proxy_state(self):
+        """Lee ProxyEnable y ProxyServer de la clave ya abierta y devuelve (habilitado, servidor)"""
         try:
-            # Open the Internet Settings registry key
-            registry = winreg.ConnectRegistry(None, winreg.HKEY_CURRENT_USER)
-            key = winreg.OpenKey(registry, r"Software\Microsoft\Windows\CurrentVersion\Internet Settings")
-            
-            # Check if proxy is enabled
-            proxy_enable, _ = winreg.QueryValueEx(key, "ProxyEnable")
-            
-            return bool(proxy_enable)
+            return bool(self._query_reg_value("ProxyEnable", 0)), self._query_reg_value("ProxyServer", "")
         except OSError as e:
-            print(f"Error checking proxy status: {e}")
-            return False
+            log.warning("Error checking proxy status: %s", e)
+            return False, ""
     
-    def get_current_proxy(self):
+    def _query_reg_value(self, name, default):
+        """Lee un valor de Internet Settings; si no existe (perfil sin proxy configurado) devuelve `default`"""
         try:
-            # Open the Internet Settings registry key
-            registry = winreg.ConnectRegistry(None, winreg.HKEY_CURRENT_USER)
-            key = winreg.OpenKey(registry, r"Software\Microsoft\Windows\CurrentVersion\Internet Settings")
-            
-            # Get proxy server
-            proxy_server, _ = winreg.QueryValueEx(key, "ProxyServer")
-            
-            return proxy_server
-        except OSError as e:
-            print(f"Error getting proxy server: {e}")
-            return ""
+            value, _ = winreg.QueryValueEx(self._inet_key, name)
+        except FileNotFoundError:
+            return default
+        return value
     
-    def enable_proxy(self):
+    def _on_registry_changed(self):
+        # Otro proceso (o esta misma aplicación) cambió Internet Settings: releer el estado real
+        if self._closing:
+            # La clave ya se cerró (o se va a cerrar) en closeEvent
+            return
+        self.proxy_enabled, self.active_proxy_server = self._read_proxy_state()
+        self.update_ui_state()
+    
+    def _set_reg_value(self, name, value_type, value):
+        """Escribe un valor en Internet Settings solo si difiere del actual; devuelve si lo escribió"""
+        # Se lee el valor actual (y no uno recordado) porque otros procesos también pueden cambiarlo
         try:
-            # Format proxy server string
-            proxy_server = f"{self.proxy_ip}:{self.proxy_port}"
-            
-            # Open the Internet Settings registry key
-            registry = winreg.ConnectRegistry(None, winreg.HKEY_CURRENT_USER)
-            key = winreg.OpenKey(registry, r"Software\Microsoft\Windows\CurrentVersion\Internet Settings", 0, winreg.KEY_WRITE)
-            
+            current, _ = winreg.QueryValueEx(self._inet_key, name)
+        except FileNotFoundError:
+            current = None
+        if current == value:
+            return False
+        winreg.SetValueEx(self._inet_key, name, 0, value_type, value)
+        return True
+    
+    def enable_proxy(self):
+        self._request_proxy_state(True)
+    
+    def disable_proxy(self):
+        self._request_proxy_state(False)
+    
+    def _request_proxy_state(self, enable):
+        self._pending_state = enable
+        # (Re)iniciar la espera: una ráfaga de peticiones se aplica una sola vez
+        self._apply_timer.start()
+    
+    def _apply_pending(self):
+        if self._proxy_op is not None:
+            # Todavía se está aplicando el cambio anterior; reintentar al terminar la espera
+            self._apply_timer.start()
+            return
+        if self._pending_state:
+            self._apply_enable()
+        else:
+            self._apply_disable()
+    
+    def _apply_enable(self):
+        # Valor de ProxyServer ya formateado al cambiar la configuración
+        proxy_server = self.proxy_server
+        
+        def work():
             # Enable proxy
-            winreg.SetValueEx(key, "ProxyEnable", 0, winreg.REG_DWORD, 1)
+            changed = self._set_reg_value("ProxyEnable", winreg.REG_DWORD, 1)
             
             # Set proxy server
-            winreg.SetValueEx(key, "ProxyServer", 0, winreg.REG_SZ, proxy_server)
-            
-            # Refresh system settings
-            self.refresh_system_settings()
-            
-            # Update status
-            self.proxy_enabled = True
-            self.update_ui_state()
+            changed |= self._set_reg_value("ProxyServer", winreg.REG_SZ, proxy_server)
             
-            # Mostrar mensaje más elegante
-            QMessageBox.information(
-                self, 
-                "Proxy Habilitado", 
-                f"<h3>¡Conexión Exitosa!</h3><p>Proxy configurado a <b>{proxy_server}</b></p>",
-                QMessageBox.Ok
-            )
-        except OSError as e:
-            QMessageBox.critical(
-                self,
-                "Error",
-                f"<h3>No se pudo habilitar el proxy</h3><p>{str(e)}</p>",
-                QMessageBox.Ok
-            )
+            # Refresh system settings (solo si algo cambió en el registro)
+            if changed:
+                self.refresh_system_settings()
+        
+        self._start_proxy_op(work, True, proxy_server)
     
-    def disable_proxy(self):
-        try:
-            # Open the Internet Settings registry key
-            registry = winreg.ConnectRegistry(None, winreg.HKEY_CURRENT_USER)
-            key = winreg.OpenKey(registry, r"Software\Microsoft\Windows\CurrentVersion\Internet Settings", 0, winreg.KEY_WRITE)
-            
-            # Disable proxy
-            winreg.SetValueEx(key, "ProxyEnable", 0, winreg.REG_DWORD, 0)
-            
-            # Refresh system settings
-            self.refresh_system_settings()
-            
-            # Update status
-            self.proxy_enabled = False
+    def _apply_disable(self):
+        def work():
+            # Disable proxy (y refrescar solo si estaba habilitado)
+            if self._set_reg_value("ProxyEnable", winreg.REG_DWORD, 0):
+                self.refresh_system_settings()
+        
+        self._start_proxy_op(work, False)
+    
+    def _start_proxy_op(self, work, enable, proxy_server=""):
+        """Ejecuta `work` en el QThreadPool; el resultado llega a _on_proxy_op_done en el hilo de la UI"""
+        op = _ProxyOp(work, enable, proxy_server)
+        op.signals.done.connect(self._on_proxy_op_done)
+        self._proxy_op = op
+        # Deshabilita los botones hasta que termine, para evitar reentradas
+        self.update_ui_state()
+        QThreadPool.globalInstance().start(op)
+    
+    def _on_proxy_op_done(self, ok, error):
+        if self._closing:
+            return
+        op, self._proxy_op = self._proxy_op, None
+        if not ok:
             self.update_ui_state()
-            
-            # Mostrar mensaje más elegante
-            QMessageBox.information(
-                self, 
-                "Proxy Deshabilitado", 
-                "<h3>Proxy Desactivado</h3><p>La configuración de proxy ha sido deshabilitada correctamente.</p>",
-                QMessageBox.Ok
-            )
-            
-        except OSError as e:
-            QMessageBox.critical(
-                self, 
-                "Error", 
-                f"<h3>No se pudo deshabilitar el proxy</h3><p>{str(e)}</p>",
-                QMessageBox.Ok
-            )
+            action = "habilitar" if op.enable else "deshabilitar"
+            self._info("Error", f"<h3>No se pudo {action} el proxy</h3><p>{error}</p>", QMessageBox.Critical)
+            return
+        
+        # Update status
+        self.proxy_enabled = op.enable
+        if op.enable:
+            self.active_proxy_server = op.proxy_server
+        self.update_ui_state()
+        
+        # Mostrar mensaje más elegante
+        if op.enable:
+            self._info("Proxy Habilitado",
+                       f"<h3>¡Conexión Exitosa!</h3><p>Proxy configurado a <b>{op.proxy_server}</b></p>")
+        else:
+            self._info("Proxy Deshabilitado", self.DISABLED_MESSAGE)
     
     def refresh_system_settings(self):
-        # Notify Windows of settings change
-        # This is equivalent to the InternetSetOption API call with INTERNET_OPTION_REFRESH
+        # Notificar a WinINET (y a los procesos que lo usan) que la configuración de proxy cambió
         try:
-            # Run a PowerShell command to refresh settings
-            subprocess.run(["powershell", "-Command", "& {(New-Object -ComObject WScript.Shell).SendKeys('^{F5}'); Start-Sleep -Milliseconds 500}"], 
-                          capture_output=True, text=True, check=True)
-        except (OSError, subprocess.SubprocessError) as e:
-            print(f"Error refreshing settings: {e}")
+            for option in (INTERNET_OPTION_SETTINGS_CHANGED, INTERNET_OPTION_REFRESH):
+                if not _InternetSetOptionW(None, option, None, 0):
+                    raise ctypes.WinError(ctypes.get_last_error())
+        except OSError as e:
+            log.warning("Error refreshing settings: %s", e)
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     
-    # Cargar el icono de la aplicación
-    try:
-        # Intentar cargar el icono desde la ruta relativa
-        icon_path = str(Path(__file__).parent / "icon.ico")
-        app_icon = QIcon(icon_path)
-        app.setWindowIcon(app_icon)
-    except (FileNotFoundError, OSError) as e:
-        print(f"No se pudo cargar el icono: {e}")
+    # Mostrar los avisos en la consola si la hay (con pythonw.exe no hay stderr y no se escribe nada)
+    if sys.stderr:
+        logging.basicConfig(level=logging.WARNING)
     
     # Establecer estilo de aplicación moderno
     app.setStyle("Fusion")
     
     # Crear paleta de colores personalizada
     palette = QPalette()
-    palette.setColor(QPalette.Window, QColor(250, 250, 250))
-    palette.setColor(QPalette.WindowText, QColor(50, 50, 50))
-    palette.setColor(QPalette.Base, QColor(255, 255, 255))
-    palette.setColor(QPalette.AlternateBase, QColor(245, 245, 245))
-    palette.setColor(QPalette.ToolTipBase, QColor(255, 255, 255))
-    palette.setColor(QPalette.ToolTipText, QColor(50, 50, 50))
-    palette.setColor(QPalette.Text, QColor(50, 50, 50))
-    palette.setColor(QPalette.Button, QColor(240, 240, 240))
-    palette.setColor(QPalette.ButtonText, QColor(50, 50, 50))
-    palette.setColor(QPalette.Highlight, QColor(33, 150, 243))  # Material Blue
-    palette.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
+    for role, rgb in _PALETTE_SPEC:
+        palette.setColor(role, QColor(*rgb))
     app.setPalette(palette)
     
-    # Establecer estilo global
-    app.setStyleSheet("""
-        QMessageBox {
-            background-color: white;
-        }
-        QMessageBox QLabel {
-            color: #333333;
-        }
-        QMessageBox QPushButton {
-            background-color: #2196F3;
-            color: white;
-            border: none;
-            border-radius: 4px;
-            padding: 6px 12px;
-            font-weight: bold;
-        }
-        QMessageBox QPushButton:hover {
-            background-color: #1976D2;
-        }
-        QMessageBox QPushButton:pressed {
-            background-color: #0D47A1;
-        }
-    """)
+    # Establecer estilo global (única hoja de estilo de la aplicación)
+    app.setStyleSheet(load_stylesheet())
     
     # Create and show the main window
     window = ProxyManager()
     window.show()
     
+    # Cargar el icono (lectura de disco y decodificación del .ico) después del primer pintado;
+    # las ventanas sin icono propio heredan el de la aplicación
+    def load_icon():
+        if ICON_PATH.is_file():
+            app.setWindowIcon(QIcon(str(ICON_PATH)))
+        else:
+            log.warning("No se encontró el icono: %s", ICON_PATH)
+    QTimer.singleShot(0, load_icon)
+    
     sys.exit(app.exec())
\ No newline at end of file